@@ -0,0 +1,76 @@
+"""Lookup latency of the in-memory product search index.
+
+    python -m benchmarks.bench_search --products 1000000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from search_index import ProductSearchIndex
+
+
+BRANDS = ["acme", "apex", "nova", "zenith", "orbit", "lumen", "vertex", "quantum", "atlas", "fusion"]
+ADJECTIVES = ["wireless", "compact", "ultra", "classic", "premium", "portable", "smart", "organic", "deluxe", "mini"]
+NOUNS = ["headphones", "keyboard", "blender", "backpack", "lamp", "speaker", "kettle", "monitor", "jacket", "camera",
+         "charger", "notebook", "bottle", "sneakers", "watch", "router", "drone", "mattress", "toaster", "tripod"]
+
+
+def product_name(rng, product_id):
+    # A model number keeps most names unique, like a real supplier catalog.
+    return f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.choice('abcdefghjkmnpqrstuvwxyz')}{product_id % 9973}"
+
+
+def typo(rng, word):
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + word[i + 1:]
+
+
+def queries(rng, count):
+    for _ in range(count):
+        kind = rng.choice(["prefix", "exact", "typo", "two_words"])
+        noun = rng.choice(NOUNS)
+        if kind == "prefix":
+            yield kind, noun[:rng.randint(2, 4)]
+        elif kind == "exact":
+            yield kind, noun.upper()
+        elif kind == "typo":
+            yield kind, typo(rng, noun)
+        else:
+            yield kind, f"{rng.choice(BRANDS)} {noun[:3]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = ProductSearchIndex()
+    start = time.perf_counter()
+    for product_id in range(1, args.products + 1):
+        index.add(product_id, product_name(rng, product_id))
+    print(f"indexed {args.products:,} products in {time.perf_counter() - start:.1f}s")
+
+    timings = {}
+    for kind, query in queries(rng, args.queries):
+        start = time.perf_counter()
+        index.search(query, args.limit)
+        timings.setdefault(kind, []).append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for product_id in range(1, 1001):
+        index.add(product_id, product_name(rng, product_id))
+    print(f"incremental update: {(time.perf_counter() - start) * 1000 / 1000:.3f} ms per product")
+
+    print(f"{'query':<10} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind, samples in sorted(timings.items()):
+        cuts = statistics.quantiles(samples, n=100)
+        print(f"{kind:<10} {len(samples):>6} {cuts[49]:>8.2f} {cuts[94]:>8.2f} {cuts[98]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
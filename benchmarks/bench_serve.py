@@ -0,0 +1,155 @@
+"""Startup time and throughput of serve.py's pre-forked workers against the
+single-process development server (python app.py).
+
+    python -m benchmarks.bench_serve --clients 16 --duration 10
+    PRODUCT_CACHE_URL=redis://localhost:6379/0 python -m benchmarks.bench_serve --workers 4
+
+serve.py only runs more than one worker when the product and idempotency caches are
+in Redis, so --workers defaults to what serve.py would pick.
+
+Both servers run as subprocesses against the same seeded SQLite database. Startup
+is the time from launching the process until it first answers GET /products;
+throughput comes from --clients client processes issuing a mix of catalog, order,
+customer and tracking reads back to back for --duration seconds.
+"""
+import argparse
+import os
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.seed import SeedVolumes, WORDS, seed
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_TIMEOUT = 60
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as err:
+        return err.code
+
+
+def wait_until_serving(base_url, started):
+    while time.perf_counter() - started < STARTUP_TIMEOUT:
+        try:
+            if get(base_url + "/products?limit=1") == 200:
+                return time.perf_counter() - started
+        except OSError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"{base_url} did not start within {STARTUP_TIMEOUT}s")
+
+
+def client(base_url, volumes, duration, seed):
+    rng = random.Random(seed)
+    paths = [
+        lambda: "/products?limit=20",
+        lambda: f"/products/search?q={rng.choice(WORDS)[:4]}",
+        lambda: f"/orders/{rng.randint(1, volumes.orders)}",
+        lambda: f"/customers/{rng.randint(1, volumes.customers)}",
+        lambda: f"/track_order/{rng.randint(1, volumes.orders)}",
+    ]
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            status = get(base_url + rng.choice(paths)())
+        except OSError:
+            status = 599
+        latencies.append((time.perf_counter() - start) * 1000)
+        errors += status >= 500
+    return latencies, errors
+
+
+def measure(name, command, env, volumes, args):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    # A session of its own, so stopping it also stops the dev server's reloader child
+    # and serve.py's workers.
+    process = subprocess.Popen(command, cwd=ROOT, env={**env, "PORT": str(port)}, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        startup = wait_until_serving(base_url, started)
+        with ProcessPoolExecutor(args.clients) as executor:
+            futures = [executor.submit(client, base_url, volumes, args.duration, seed) for seed in range(args.clients)]
+            results = [future.result() for future in futures]
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "name": name,
+        "startup_s": startup,
+        "throughput": len(latencies) / args.duration,
+        "p50_ms": cuts[49],
+        "p99_ms": cuts[98],
+        "errors": sum(errors for _, errors in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, help="serve.py worker processes.")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client processes.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per server.")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ecommerce-bench-serve-")
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+           "SLOW_REQUEST_MS": "60000", "SLOW_QUERY_MS": "60000"}
+    os.environ.update(env)
+
+    import app as api
+    from serve import default_workers
+
+    if args.workers is None:
+        args.workers = default_workers(api.config_from_env())
+    app = api.create_app()
+    volumes = SeedVolumes(args.customers, args.products, args.orders)
+    with app.app_context():
+        api.db.create_all()
+        seed(api.db.session, (api.Customer, api.CustomerAccount, api.Product, api.Order, api.OrderProduct), volumes)
+        api.rebuild_rollups(api.db.session)
+        api.db.session.commit()
+    for engine in api.app_engines(app):
+        engine.dispose()
+
+    results = [
+        measure("python app.py (dev server)", [sys.executable, "app.py"], env, volumes, args),
+        measure(f"python serve.py --workers {args.workers}", [sys.executable, "serve.py", "--workers", str(args.workers)], env, volumes, args),
+    ]
+    print(f"{args.clients} clients for {args.duration:.0f}s each, {os.cpu_count()} CPUs")
+    print(f"{'server':<36} {'startup s':>10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'5xx':>5}")
+    for result in results:
+        print(f"{result['name']:<36} {result['startup_s']:>10.2f} {result['throughput']:>8.0f} "
+              f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Load-test every route of the API against a seeded database.
+
+    python -m benchmarks.run                         # compare with benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline         # record a new baseline
+    python -m benchmarks.run --transport http        # go through a local WSGI server
+
+Each scenario is driven by --concurrency threads issuing --requests requests per
+round, over --rounds rounds. The run fails (exit status 1) when an endpoint's median latency or
+throughput is worse than the baseline by more than --threshold, when it runs more
+SQL statements per request, or when more of its requests fail.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from werkzeug.exceptions import HTTPException
+
+from benchmarks.seed import SeedVolumes, WORDS, seed
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Latency differences smaller than this are treated as noise.
+MIN_REGRESSION_MS = 1.0
+WARMUP_REQUESTS = 5
+# Customers removed by each POST /customers/bulk_delete request.
+PURGE_BATCH = 5
+
+
+class Context:
+    """Hands out IDs to scenarios. Destructive scenarios take from pools of rows that
+    nothing else reads, so every delete hits a row that still exists."""
+
+    def __init__(self, volumes, requests):
+        self.volumes = volumes
+        self.rng = random.Random(7)
+        self._lock = threading.Lock()
+        spare_customers = range(volumes.customers + 1, volumes.customers + volumes.spare + 1)
+        purged_customers = range(volumes.customers + volumes.spare + 1, volumes.customers + volumes.spare + volumes.purge + 1)
+        spare_products = range(volumes.products + 1, volumes.products + volumes.spare + 1)
+        # Orders from the top of the range are deleted or cancelled; reads use the rest.
+        doomed = min(2 * requests, volumes.orders // 2)
+        self.readable_orders = volumes.orders - doomed
+        self._pools = {
+            "customer": iter(spare_customers),
+            "account": iter(spare_customers),
+            "product": iter(spare_products),
+            "purge": iter(purged_customers),
+            "order": iter(range(volumes.orders, self.readable_orders, -1)),
+        }
+        self._unique = itertools.count()
+
+    def take(self, pool):
+        with self._lock:
+            return next(self._pools[pool])
+
+    def take_many(self, pool, count):
+        with self._lock:
+            return [next(self._pools[pool]) for _ in range(count)]
+
+    def unique(self):
+        with self._lock:
+            return next(self._unique)
+
+    def customer_id(self):
+        return self.rng.randint(1, self.volumes.customers)
+
+    def product_id(self):
+        return self.rng.randint(1, self.volumes.products)
+
+    def order_id(self):
+        return self.rng.randint(1, self.readable_orders)
+
+    def order_body(self):
+        return {"date": date.today().isoformat(), "customer_id": self.customer_id(),
+                "items": [{"product_id": product_id, "quantity": self.rng.randint(1, 3)}
+                          for product_id in {self.product_id() for _ in range(3)}]}
+
+
+def ndjson(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+
+# The same order retried with one Idempotency-Key: only the first request creates it.
+REPLAYED_ORDER = {"date": date.today().isoformat(), "customer_id": 1, "items": [{"product_id": 1, "quantity": 1}]}
+
+# (name, method, function returning (path, json body or None, raw body or None[, headers]))
+# Text after a space in the name describes a variant of the route.
+SCENARIOS = [
+    ("GET /metrics", "GET", lambda ctx: ("/metrics", None, None)),
+    ("GET /products/search", "GET", lambda ctx: (f"/products/search?q={ctx.rng.choice(WORDS)[:4]}", None, None)),
+    ("GET /products", "GET", lambda ctx: (f"/products?after={ctx.product_id()}", None, None)),
+    ("GET /products?stream=ndjson", "GET", lambda ctx: ("/products?stream=ndjson", None, None)),
+    ("GET /products/name_of_product/<name>", "GET", lambda ctx: (f"/products/name_of_product/missing {ctx.unique()}", None, None)),
+    ("POST /products", "POST", lambda ctx: ("/products", {"name": f"bench product {ctx.unique()}", "price": 9.99, "stock": 100}, None)),
+    ("PUT /products/<id>", "PUT", lambda ctx: (f"/products/{ctx.product_id()}", {"price": 19.99}, None)),
+    ("DELETE /products/<id>", "DELETE", lambda ctx: (f"/products/{ctx.take('product')}", None, None)),
+    ("POST /products/import", "POST", lambda ctx: ("/products/import", None, ndjson(
+        {"name": f"imported {ctx.unique()}", "price": 5.0, "stock": 10} for _ in range(50)))),
+    ("POST /products/restock_products", "POST", lambda ctx: ("/products/restock_products", {"threshold": 10}, None)),
+    ("GET /orders", "GET", lambda ctx: (f"/orders?after={ctx.order_id()}", None, None)),
+    ("GET /orders?include=products", "GET", lambda ctx: (f"/orders?include=products&after={ctx.order_id()}", None, None)),
+    ("GET /orders/<id>", "GET", lambda ctx: (f"/orders/{ctx.order_id()}", None, None)),
+    ("POST /orders", "POST", lambda ctx: ("/orders", ctx.order_body(), None)),
+    ("POST /orders (Idempotency-Key replay)", "POST", lambda ctx: ("/orders", REPLAYED_ORDER, None, {"Idempotency-Key": "bench-replay"})),
+    ("POST /orders/bulk", "POST", lambda ctx: ("/orders/bulk", [ctx.order_body() for _ in range(20)], None)),
+    ("PUT /orders/<id>", "PUT", lambda ctx: (f"/orders/{ctx.order_id()}", {"date": date.today().isoformat()}, None)),
+    ("DELETE /orders/<id>", "DELETE", lambda ctx: (f"/orders/{ctx.take('order')}", None, None)),
+    ("GET /customers/<id>/orders", "GET", lambda ctx: (f"/customers/{ctx.customer_id()}/orders", None, None)),
+    ("GET /customers/<id>/orders?from=", "GET", lambda ctx: (f"/customers/{ctx.customer_id()}/orders?from={date.today().replace(day=1).isoformat()}&product_ids=false", None, None)),
+    ("GET /track_order/<id>", "GET", lambda ctx: (f"/track_order/{ctx.order_id()}", None, None)),
+    ("GET /track_order/<id> (same order)", "GET", lambda ctx: ("/track_order/1", None, None)),
+    ("DELETE /cancel_order/<id>", "DELETE", lambda ctx: (f"/cancel_order/{ctx.take('order')}", None, None)),
+    ("GET /customers", "GET", lambda ctx: (f"/customers?after={ctx.customer_id()}", None, None)),
+    ("GET /customers/<id>", "GET", lambda ctx: (f"/customers/{ctx.customer_id()}", None, None)),
+    ("POST /customers", "POST", lambda ctx: ("/customers", {"name": "Bench", "email": f"bench{ctx.unique()}@example.com", "phone": "5550000000"}, None)),
+    ("POST /customers/import", "POST", lambda ctx: ("/customers/import", None, ndjson(
+        {"name": "Imported", "email": f"import{ctx.unique()}@example.com", "phone": "5550000000"} for _ in range(50)))),
+    ("PUT /customers/<id>", "PUT", lambda ctx: (f"/customers/{ctx.customer_id()}", {"phone": "5551111111"}, None)),
+    ("DELETE /customers/<id>", "DELETE", lambda ctx: (f"/customers/{ctx.take('customer')}", None, None)),
+    ("POST /customers/bulk_delete", "POST", lambda ctx: ("/customers/bulk_delete", {"customer_ids": ctx.take_many("purge", PURGE_BATCH)}, None)),
+    ("GET /analytics/sales/daily", "GET", lambda ctx: (f"/analytics/sales/daily?product_id={ctx.product_id()}&from={date.today().replace(day=1).isoformat()}", None, None)),
+    ("GET /analytics/products/top", "GET", lambda ctx: ("/analytics/products/top?by=units", None, None)),
+    ("GET /analytics/customers/top", "GET", lambda ctx: ("/analytics/customers/top", None, None)),
+    ("GET /analytics/basket_size", "GET", lambda ctx: ("/analytics/basket_size", None, None)),
+    ("GET /customer_accounts", "GET", lambda ctx: (f"/customer_accounts?after={ctx.customer_id()}", None, None)),
+    ("POST /customer_accounts", "POST", lambda ctx: ("/customer_accounts", {"username": f"bench{ctx.unique()}", "password": "secret", "customer_id": ctx.customer_id()}, None)),
+    ("PUT /customer_accounts/<id>", "PUT", lambda ctx: (f"/customer_accounts/{ctx.customer_id()}", {"password": "changed"}, None)),
+    ("DELETE /customer_accounts/<id>", "DELETE", lambda ctx: (f"/customer_accounts/{ctx.take('account')}", None, None)),
+]
+
+
+class ClientTransport:
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, json_body, raw_body, headers):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        kwargs = {"json": json_body} if json_body is not None else {}
+        if raw_body is not None:
+            kwargs = {"data": raw_body, "content_type": "application/x-ndjson"}
+        response = client.open(path, method=method, headers=headers, **kwargs)
+        response.get_data()
+        response.close()
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    def __init__(self, app):
+        from werkzeug.serving import make_server
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def request(self, method, path, json_body, raw_body, headers):
+        data, headers = None, dict(headers)
+        if json_body is not None:
+            data, headers["Content-Type"] = json.dumps(json_body).encode(), "application/json"
+        elif raw_body is not None:
+            data, headers["Content-Type"] = raw_body.encode(), "application/x-ndjson"
+        request = urllib.request.Request(self.base_url + urllib.request.quote(path, safe="/?=&"),
+                                         data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as err:
+            return err.code
+
+    def close(self):
+        self.server.shutdown()
+
+
+def route_totals(registry, method, route):
+    requests = sum(count for (m, r, _), count in registry.requests.items() if (m, r) == (method, route))
+    return requests, registry.db_statements.get((method, route), 0)
+
+
+def run_scenario(app, transport, ctx, name, method, build, requests, concurrency):
+    import metrics
+
+    def one(_):
+        path, json_body, raw_body, *headers = build(ctx)
+        start = time.perf_counter()
+        status = transport.request(method, path, json_body, raw_body, headers[0] if headers else {})
+        return (time.perf_counter() - start) * 1000, status
+
+    # A few unmeasured requests first, so connection setup and lazily built state
+    # (such as the search index) do not land in the percentiles.
+    for _ in range(WARMUP_REQUESTS):
+        one(None)
+
+    route = route_for(app, method, name.split(" ")[1])
+    requests_before, statements_before = route_totals(metrics.registry, method, route)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    requests_after, statements_after = route_totals(metrics.registry, method, route)
+
+    latencies = [latency for latency, _ in results]
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": requests,
+        "errors": sum(1 for _, status in results if status >= 500),
+        "throughput": requests / elapsed,
+        "p50_ms": cuts[49],
+        "p95_ms": cuts[94],
+        "p99_ms": cuts[98],
+        "sql_per_request": (statements_after - statements_before) / max(requests_after - requests_before, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        # Gate on the median: tail percentiles of a few hundred requests swing too
+        # much between runs to compare, so p95/p99 are only reported.
+        if result["p50_ms"] > previous["p50_ms"] * (1 + threshold) and result["p50_ms"] - previous["p50_ms"] > MIN_REGRESSION_MS:
+            regressions.append(f"{name}: p50 {previous['p50_ms']:.2f} -> {result['p50_ms']:.2f} ms")
+        if result["throughput"] < previous["throughput"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {previous['throughput']:.0f} -> {result['throughput']:.0f} req/s")
+        # Statement counts are deterministic, so any growth is a real change (an N+1 creeping in).
+        if result["sql_per_request"] > previous.get("sql_per_request", float("inf")) + 0.5:
+            regressions.append(f"{name}: SQL statements per request {previous['sql_per_request']:.1f} -> {result['sql_per_request']:.1f}")
+        error_rate = result["errors"] / result["requests"]
+        previous_error_rate = previous.get("errors", 0) / previous["requests"]
+        if error_rate > previous_error_rate + 0.05:
+            regressions.append(f"{name}: {error_rate:.0%} of responses failed with status >= 500 (baseline {previous_error_rate:.0%})")
+    return regressions
+
+
+def route_for(app, method, path):
+    sample = path.split("?")[0].replace("<id>", "1").replace("<name>", "x")
+    try:
+        rule, _ = app.url_map.bind("localhost").match(sample, method, return_rule=True)
+    except HTTPException:
+        return None
+    return rule.rule
+
+
+def uncovered_routes(app):
+    covered = {" ".join(name.split(" ")[:2]).split("?")[0] for name, _, _ in SCENARIOS}
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        path = re.sub(r"<(?:\w+:)?(\w+)>", lambda m: "<name>" if m.group(1) == "name" else "<id>", rule.rule)
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+            if f"{method} {path}" not in covered:
+                missing.append(f"{method} {rule.rule}")
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Defaults to a fresh SQLite file in a temporary directory.")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--lines-per-order", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint and round.")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per endpoint; the median round is reported.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--transport", choices=["client", "http"], default="client")
+    parser.add_argument("--only", help="Only run scenarios whose name contains this text.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Allowed regression, as a fraction.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ecommerce-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault("SLOW_REQUEST_MS", "60000")
+    os.environ.setdefault("SLOW_QUERY_MS", "60000")
+    os.environ.setdefault("DB_POOL_SIZE", str(args.concurrency))
+
+    import app as api
+
+    app = api.create_app()
+    spare = (args.requests + WARMUP_REQUESTS) * args.rounds
+    volumes = SeedVolumes(args.customers, args.products, args.orders, args.lines_per_order, spare=spare, purge=spare * PURGE_BATCH)
+    start = time.perf_counter()
+    with app.app_context():
+        api.db.drop_all()
+        api.db.create_all()
+        seed(api.db.session, (api.Customer, api.CustomerAccount, api.Product, api.Order, api.OrderProduct), volumes)
+        api.rebuild_rollups(api.db.session)
+        api.db.session.commit()
+    print(f"seeded {volumes.customers} customers, {volumes.products} products, {volumes.orders} orders "
+          f"in {time.perf_counter() - start:.1f}s ({os.environ['DATABASE_URL'].split('@')[-1]})")
+
+    for route in uncovered_routes(app):
+        print(f"warning: no scenario for {route}")
+
+    ctx = Context(volumes, (args.requests + WARMUP_REQUESTS) * args.rounds)
+    transport = ClientTransport(app) if args.transport == "client" else HTTPTransport(app)
+    results = {}
+    try:
+        for name, method, build in SCENARIOS:
+            if args.only and args.only not in name:
+                continue
+            # Keep the median round, which irons out one-off stalls on a busy machine.
+            rounds = [run_scenario(app, transport, ctx, name, method, build, args.requests, args.concurrency)
+                      for _ in range(args.rounds)]
+            results[name] = sorted(rounds, key=lambda result: result["p50_ms"])[len(rounds) // 2]
+    finally:
+        transport.close()
+
+    print(f"{'endpoint':<40} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql/req':>8} {'5xx':>5}")
+    for name, result in results.items():
+        print(f"{name:<40} {result['throughput']:>8.0f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+              f"{result['p99_ms']:>8.2f} {result['sql_per_request']:>8.1f} {result['errors']:>5}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
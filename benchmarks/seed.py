@@ -0,0 +1,74 @@
+"""Seed a database with synthetic customers, products, orders and order lines."""
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+
+CHUNK_SIZE = 5000
+WORDS = ["wireless", "compact", "ultra", "classic", "premium", "portable", "smart", "organic", "deluxe", "mini",
+         "headphones", "keyboard", "blender", "backpack", "lamp", "speaker", "kettle", "monitor", "jacket", "camera"]
+
+
+class SeedVolumes:
+    def __init__(self, customers=1000, products=2000, orders=5000, lines_per_order=3, spare=200, purge=0):
+        self.customers = customers
+        self.products = products
+        self.orders = orders
+        self.lines_per_order = lines_per_order
+        # Extra rows with no orders attached, for the scenarios that delete things.
+        self.spare = spare
+        # Extra customers with no orders, for bulk deletes.
+        self.purge = purge
+
+
+def insert_chunked(session, table, rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            session.execute(insert(table), chunk)
+            chunk = []
+    if chunk:
+        session.execute(insert(table), chunk)
+
+
+def seed(session, models, volumes, seed=1):
+    rng = random.Random(seed)
+    Customer, CustomerAccount, Product, Order, OrderProduct = models
+    customers = volumes.customers + volumes.spare + volumes.purge
+    products = volumes.products + volumes.spare
+
+    insert_chunked(session, Customer.__table__, (
+        {"customer_id": i, "name": f"Customer {i}", "email": f"customer{i}@example.com", "phone": f"555{i:07d}"}
+        for i in range(1, customers + 1)
+    ))
+    insert_chunked(session, CustomerAccount.__table__, (
+        {"account_id": i, "username": f"user{i}", "password": "secret", "customer_id": i}
+        for i in range(1, customers + 1)
+    ))
+    prices = [round(rng.uniform(1, 500), 2) for _ in range(products)]
+    insert_chunked(session, Product.__table__, (
+        {"product_id": i, "name": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+         "price": prices[i - 1], "stock": 1_000_000}
+        for i in range(1, products + 1)
+    ))
+
+    lines = min(volumes.lines_per_order, volumes.products)
+    order_lines = [
+        [(product_id, rng.randint(1, 3)) for product_id in rng.sample(range(1, volumes.products + 1), lines)]
+        for _ in range(volumes.orders)
+    ]
+    start = date.today() - timedelta(days=730)
+    insert_chunked(session, Order.__table__, (
+        {"order_id": i, "date": start + timedelta(days=rng.randrange(730)),
+         "customer_id": rng.randint(1, volumes.customers),
+         "total": round(sum(quantity * prices[product_id - 1] for product_id, quantity in order_lines[i - 1]), 2)}
+        for i in range(1, volumes.orders + 1)
+    ))
+    insert_chunked(session, OrderProduct.__table__, (
+        {"order_id": order_id, "product_id": product_id, "quantity": quantity, "unit_price": prices[product_id - 1]}
+        for order_id in range(1, volumes.orders + 1)
+        for product_id, quantity in order_lines[order_id - 1]
+    ))
+    session.commit()
@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+# Values stored in a cache must be JSON-serializable so that every backend can hold them.
+
+class MemoryCache:
+    """In-process LRU cache with a per-entry TTL. Counters are kept apart from the
+    entries so that eviction can never reset a version number."""
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        """Sets the key only if it holds no live entry, and returns whether it did."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def replace(self, key, expected, value, ttl=None):
+        """Sets the key only if it still holds `expected`, and returns whether it did."""
+        with self._lock:
+            if not self._holds(key, expected):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete_if(self, key, expected):
+        """Deletes the key only if it still holds `expected`, and returns whether it did."""
+        with self._lock:
+            if not self._holds(key, expected):
+                return False
+            del self._entries[key]
+            return True
+
+    def _holds(self, key, expected):
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] >= time.monotonic() and entry[1] == expected
+
+    def _store(self, key, value, ttl):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Compare-and-set for RedisCache.replace and delete_if. Values are compared as the JSON
+# they were stored as, which json.dumps reproduces for an equal dict built the same way.
+REDIS_REPLACE = """
+if redis.call("get", KEYS[1]) ~= ARGV[1] then return 0 end
+redis.call("set", KEYS[1], ARGV[2], "EX", ARGV[3])
+return 1
+"""
+REDIS_DELETE_IF = """
+if redis.call("get", KEYS[1]) ~= ARGV[1] then return 0 end
+return redis.call("del", KEYS[1])
+"""
+
+
+class RedisCache:
+    """Same interface as MemoryCache, shared between processes through Redis.
+    Needs the optional redis package."""
+
+    def __init__(self, url, ttl=300, prefix="ecommerce:"):
+        try:
+            import redis
+        except ImportError as err:
+            raise RuntimeError("The redis package is required to use a redis:// cache URL") from err
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self._replace = self.client.register_script(REDIS_REPLACE)
+        self._delete_if = self.client.register_script(REDIS_DELETE_IF)
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl if ttl is None else ttl)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl if ttl is None else ttl, nx=True))
+
+    def replace(self, key, expected, value, ttl=None):
+        return bool(self._replace(keys=[self.prefix + key], args=[json.dumps(expected), json.dumps(value), self.ttl if ttl is None else ttl]))
+
+    def delete_if(self, key, expected):
+        return bool(self._delete_if(keys=[self.prefix + key], args=[json.dumps(expected)]))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def get_counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+def is_shared(url):
+    """Whether make_cache(url) gives a cache that every process sees."""
+    return bool(url) and url.startswith(("redis://", "rediss://"))
+
+
+def make_cache(url=None, max_entries=1024, ttl=300):
+    if is_shared(url):
+        return RedisCache(url, ttl=ttl)
+    return MemoryCache(max_entries=max_entries, ttl=ttl)
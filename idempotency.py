@@ -0,0 +1,77 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from flask import Response, current_app, jsonify, make_response, request
+
+import metrics
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADERS = ("Content-Type", "Location")
+
+
+def idempotent(view):
+    """Lets clients retry a POST safely by sending an Idempotency-Key header.
+
+    The first request with a key runs the view and its response is kept in
+    app.extensions["idempotency_store"] (a bounded, expiring cache) for
+    IDEMPOTENCY_KEY_TTL seconds. A retry with the same key and the same request
+    gets that response back, marked with `Idempotent-Replayed: true`, without the
+    view running again. Reusing a key for a different request is rejected with
+    422, and a retry that arrives while the first request is still running gets
+    409. Responses with status 500 or above are not kept, so those can be retried.
+
+    While the view runs the key holds a claim that expires after
+    IDEMPOTENCY_CLAIM_TTL seconds, so a request whose worker died can be retried.
+    Each claim carries a token of its own, and the finished request only stores its
+    response (or frees the key) if the key still holds its claim: once a claim has
+    expired and another request has taken the key, that request owns it."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({"message": f"{IDEMPOTENCY_HEADER} must be between 1 and {MAX_KEY_LENGTH} characters"}), 400
+
+        metrics.registry.incr("idempotency_requests_total")
+        store = current_app.extensions["idempotency_store"]
+        store_key = f"idempotency:{request.method}:{request.path}:{key}"
+        fingerprint = hashlib.sha256(request.full_path.encode() + b"\n" + request.get_data()).hexdigest()
+        claim = {"fingerprint": fingerprint, "status": None, "claim": uuid.uuid4().hex}
+        if not store.add(store_key, claim, ttl=current_app.config['IDEMPOTENCY_CLAIM_TTL']):
+            saved = store.get(store_key)
+            if saved is not None and saved["fingerprint"] != fingerprint:
+                metrics.registry.incr("idempotency_conflicts_total")
+                return jsonify({"message": f"This {IDEMPOTENCY_HEADER} was already used for a different request"}), 422
+            if saved is None or saved["status"] is None:
+                metrics.registry.incr("idempotency_in_progress_total")
+                return jsonify({"message": f"A request with this {IDEMPOTENCY_HEADER} is still being processed; retry shortly"}), 409
+            metrics.registry.incr("idempotency_replays_total")
+            response = Response(saved["body"], status=saved["status"], headers=saved["headers"])
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            release(store, store_key, claim)
+            raise
+        if response.status_code >= 500:
+            release(store, store_key, claim)
+        elif not store.replace(store_key, claim, {
+                "fingerprint": fingerprint,
+                "status": response.status_code,
+                "body": response.get_data(as_text=True),
+                "headers": [[name, value] for name, value in response.headers if name in REPLAYED_HEADERS],
+            }, ttl=current_app.config['IDEMPOTENCY_KEY_TTL']):
+            metrics.registry.incr("idempotency_claims_lost_total")
+        return response
+    return wrapper
+
+
+def release(store, store_key, claim):
+    if not store.delete_if(store_key, claim):
+        metrics.registry.incr("idempotency_claims_lost_total")
@@ -0,0 +1,205 @@
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Per-route request/database counters and pool statistics, rendered in the
+    Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.engines = {}
+        self.reset()
+
+    def reset(self):
+        """Zeroes every counter and histogram; the registered engines stay."""
+        with self._lock:
+            self.requests = {}
+            self.latency = {}
+            self.db_statements = {}
+            self.db_time = {}
+            self.rows_serialized = {}
+            self.counters = {}
+            self.pool_wait = Histogram(POOL_WAIT_BUCKETS)
+            self.pool_checkouts = 0
+
+    def observe_request(self, method, route, status, seconds, stats):
+        with self._lock:
+            key = (method, route)
+            self.requests[key + (status,)] = self.requests.get(key + (status,), 0) + 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.db_statements[key] = self.db_statements.get(key, 0) + stats["statements"]
+            self.db_time[key] = self.db_time.get(key, 0.0) + stats["db_time"]
+            self.rows_serialized[key] = self.rows_serialized.get(key, 0) + stats["rows"]
+
+    def observe_pool_wait(self, seconds):
+        with self._lock:
+            self.pool_wait.observe(seconds)
+            self.pool_checkouts += 1
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(method, route, **extra):
+            pairs = {"method": method, "route": route, **extra}
+            return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs.items()) + "}"
+
+        def histogram(name, label_text, hist):
+            cumulative = 0
+            prefix = label_text[:-1] + "," if label_text else "{"
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{prefix}le="+Inf"}} {hist.count}')
+            lines.append(f"{name}_sum{label_text} {hist.sum}")
+            lines.append(f"{name}_count{label_text} {hist.count}")
+
+        with self._lock:
+            family("http_requests_total", "counter", "HTTP requests by route and status.")
+            for (method, route, status), value in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{labels(method, route, status=status)} {value}")
+
+            family("http_request_duration_seconds", "histogram", "HTTP request latency by route.")
+            for (method, route), hist in sorted(self.latency.items()):
+                histogram("http_request_duration_seconds", labels(method, route), hist)
+
+            family("db_statements_total", "counter", "SQL statements executed by route.")
+            for (method, route), value in sorted(self.db_statements.items()):
+                lines.append(f"db_statements_total{labels(method, route)} {value}")
+
+            family("db_time_seconds_total", "counter", "Time spent executing SQL by route.")
+            for (method, route), value in sorted(self.db_time.items()):
+                lines.append(f"db_time_seconds_total{labels(method, route)} {value}")
+
+            family("rows_serialized_total", "counter", "Rows serialized into responses by route.")
+            for (method, route), value in sorted(self.rows_serialized.items()):
+                lines.append(f"rows_serialized_total{labels(method, route)} {value}")
+
+            family("db_pool_checkout_wait_seconds", "histogram", "Time spent waiting for a pooled connection.")
+            histogram("db_pool_checkout_wait_seconds", "", self.pool_wait)
+
+            family("db_pool_connections_in_use", "gauge", "Connections currently checked out of the pool.")
+            for name, engine in sorted(self.engines.items()):
+                pool = engine.pool
+                in_use = pool.checkedout() if hasattr(pool, "checkedout") else 0
+                lines.append(f'db_pool_connections_in_use{{engine="{escape(name)}"}} {in_use}')
+
+            family("db_pool_size", "gauge", "Configured pool size.")
+            for name, engine in sorted(self.engines.items()):
+                pool = engine.pool
+                size = pool.size() if hasattr(pool, "size") else 0
+                lines.append(f'db_pool_size{{engine="{escape(name)}"}} {size}')
+
+            for name, value in sorted(self.counters.items()):
+                family(name, "counter", name.replace("_", " ") + ".")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Metrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def connect(self):
+        start = time.perf_counter()
+        connection = super().connect()
+        registry.observe_pool_wait(time.perf_counter() - start)
+        return connection
+
+
+def request_stats():
+    if has_request_context():
+        return g.get("request_metrics")
+    return None
+
+
+def record_rows(count):
+    stats = request_stats()
+    if stats is not None:
+        stats["rows"] += count
+
+
+def instrument_engine(engine, name, slow_query_ms, logger):
+    registry.engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = request_stats()
+        if stats is not None:
+            stats["statements"] += 1
+            stats["db_time"] += elapsed
+        if elapsed * 1000 >= slow_query_ms:
+            logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, name, " ".join(statement.split())[:500])
+
+
+def init_app(app):
+    @app.before_request
+    def start_request_metrics():
+        g.request_metrics = {"start": time.perf_counter(), "statements": 0, "db_time": 0.0, "rows": 0}
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.get("request_metrics")
+        if stats is None:
+            return response
+        method = request.method
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        status = response.status_code
+        slow_request_ms = app.config['SLOW_REQUEST_MS']
+
+        # Recorded when the response is closed so streamed bodies are included.
+        def finish():
+            elapsed = time.perf_counter() - stats["start"]
+            registry.observe_request(method, route, status, elapsed, stats)
+            if elapsed * 1000 >= slow_request_ms:
+                app.logger.warning(
+                    "Slow request (%.1f ms) %s %s: %d statements, %.1f ms in the database, %d rows",
+                    elapsed * 1000, method, route, stats["statements"], stats["db_time"] * 1000, stats["rows"]
+                )
+
+        response.call_on_close(finish)
+        return response
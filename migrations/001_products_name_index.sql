@@ -0,0 +1,4 @@
+-- Index used by product name lookups and search (db.create_all adds it to new databases).
+USE Online_Shopping_project;
+
+CREATE INDEX ix_Products_name ON Products (name);
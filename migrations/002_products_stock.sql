@@ -0,0 +1,4 @@
+-- Inventory column used by restocking and stock reservation at checkout.
+USE Online_Shopping_project;
+
+ALTER TABLE Products ADD COLUMN stock INT NOT NULL DEFAULT 0;
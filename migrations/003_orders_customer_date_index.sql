@@ -0,0 +1,4 @@
+-- Composite index behind GET /customers/<id>/orders (db.create_all adds it to new databases).
+USE Online_Shopping_project;
+
+CREATE INDEX ix_Orders_customer_id_date ON Orders (customer_id, date);
@@ -0,0 +1,28 @@
+-- Summary tables behind the /analytics endpoints (db.create_all adds them to new databases).
+-- Fill them from the existing orders afterwards with `flask --app app rebuild-rollups`.
+USE Online_Shopping_project;
+
+CREATE TABLE Product_Daily_Sales (
+    date DATE NOT NULL,
+    product_id INT NOT NULL,
+    units INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (date, product_id)
+);
+
+CREATE TABLE Customer_Monthly_Totals (
+    month DATE NOT NULL,
+    customer_id INT NOT NULL,
+    orders INT NOT NULL DEFAULT 0,
+    units INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, customer_id)
+);
+
+CREATE TABLE Daily_Order_Stats (
+    date DATE NOT NULL,
+    orders INT NOT NULL DEFAULT 0,
+    units INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (date)
+);
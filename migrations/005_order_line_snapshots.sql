@@ -0,0 +1,11 @@
+-- Order lines record the quantity and the unit price paid, and orders store their total.
+-- The new columns start out NULL on existing rows: fill them in batches with
+-- `flask --app app backfill-order-totals`, then apply 006 and rebuild the sales rollups
+-- with `flask --app app rebuild-rollups` so revenue uses the recorded prices.
+USE Online_Shopping_project;
+
+ALTER TABLE Order_Product
+    ADD COLUMN quantity INT NOT NULL DEFAULT 1,
+    ADD COLUMN unit_price DECIMAL(12,2) NULL;
+
+ALTER TABLE Orders ADD COLUMN total DECIMAL(12,2) NULL;
@@ -0,0 +1,6 @@
+-- Run after `flask --app app backfill-order-totals` has filled in every order (see 005).
+USE Online_Shopping_project;
+
+ALTER TABLE Order_Product MODIFY unit_price DECIMAL(12,2) NOT NULL;
+
+ALTER TABLE Orders MODIFY total DECIMAL(12,2) NOT NULL DEFAULT 0;
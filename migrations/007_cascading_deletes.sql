@@ -0,0 +1,17 @@
+-- Deleting a customer removes their account, orders and order lines, and deleting an
+-- order removes its lines, through ON DELETE CASCADE instead of row-by-row deletes.
+-- The constraint names are the ones MySQL generated for db.create_all(); check them
+-- with SHOW CREATE TABLE if the tables were created another way.
+USE Online_Shopping_project;
+
+ALTER TABLE Order_Product
+    DROP FOREIGN KEY Order_Product_ibfk_1,
+    ADD CONSTRAINT Order_Product_ibfk_1 FOREIGN KEY (order_id) REFERENCES Orders (order_id) ON DELETE CASCADE;
+
+ALTER TABLE Orders
+    DROP FOREIGN KEY Orders_ibfk_1,
+    ADD CONSTRAINT Orders_ibfk_1 FOREIGN KEY (customer_id) REFERENCES Customers (customer_id) ON DELETE CASCADE;
+
+ALTER TABLE Customer_Accounts
+    DROP FOREIGN KEY Customer_Accounts_ibfk_1,
+    ADD CONSTRAINT Customer_Accounts_ibfk_1 FOREIGN KEY (customer_id) REFERENCES Customers (customer_id) ON DELETE CASCADE;
@@ -0,0 +1,162 @@
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.exc import OperationalError
+
+import metrics
+
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+class ReplicaPool:
+    """Read replica engines. `choose` picks a healthy replica round-robin or by fewest
+    checked-out connections; a replica that has been ejected is skipped until
+    `retry_after` seconds have passed."""
+
+    STRATEGIES = ("round_robin", "least_loaded")
+
+    def __init__(self, engines, strategy="round_robin", retry_after=30):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown replica strategy {strategy!r}, expected one of {self.STRATEGIES}")
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._ejected_until = {}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def healthy(self):
+        now = time.monotonic()
+        with self._lock:
+            return [(name, engine) for name, engine in self.engines if self._ejected_until.get(name, 0) <= now]
+
+    def choose(self):
+        candidates = self.healthy()
+        if not candidates:
+            return None
+        # Rotating first also spreads ties between equally loaded replicas.
+        start = next(self._turn) % len(candidates)
+        candidates = candidates[start:] + candidates[:start]
+        if self.strategy == "least_loaded":
+            return min(candidates, key=lambda candidate: checked_out(candidate[1]))
+        return candidates[0]
+
+    def eject(self, name):
+        with self._lock:
+            self._ejected_until[name] = time.monotonic() + self.retry_after
+        metrics.registry.incr("db_replica_ejections_total")
+
+
+def checked_out(engine):
+    pool = engine.pool
+    return pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends the current request's reads to the replica
+    picked by ReplicaRouter.read_only. Flushes always go to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            replica = g.get("read_replica")
+            if replica is not None:
+                return replica[1]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Routes GET handlers decorated with `read_only` to a replica.
+
+    Reads stay on the primary when no replica is healthy, when the client asks for it
+    with `X-Consistency: strong`, and for `max_lag` seconds after the same client made
+    a write (tracked with a cookie), so clients always read their own writes. A
+    replica that raises OperationalError is ejected and the request is retried on the
+    primary. Streamed responses run their queries after the view returns, so a
+    failure part way through a stream ejects the replica but cannot be retried."""
+
+    def __init__(self, pool, max_lag=5):
+        self.pool = pool
+        self.max_lag = max_lag
+        self.session = None
+
+    def init_app(self, app, session):
+        self.session = session
+        app.extensions["replica_router"] = self
+
+        @app.before_request
+        def reset_read_replica():
+            g.read_replica = None
+            g.read_primary = False
+
+        @app.after_request
+        def remember_write(response):
+            if self.pool.engines and self.max_lag and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+                response.set_cookie(
+                    READ_PRIMARY_COOKIE, str(time.time() + self.max_lag),
+                    max_age = self.max_lag, httponly = True, samesite = "Lax"
+                )
+            return response
+
+        @app.teardown_request
+        def release_read_replica(exc):
+            # Ends the read transaction so the replica connection goes back to its
+            # pool and the next request does not read from an old snapshot.
+            if g.pop("read_replica", None) is not None:
+                self.session.rollback()
+
+    def use_primary(self):
+        g.read_primary = True
+
+    def wants_primary(self):
+        if g.get("read_primary") or request.headers.get("X-Consistency", "").lower() == "strong":
+            return True
+        until = request.cookies.get(READ_PRIMARY_COOKIE)
+        try:
+            return until is not None and float(until) > time.time()
+        except ValueError:
+            return False
+
+    def read_only(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return self.call_read_only(view, *args, **kwargs)
+        return wrapper
+
+    def call_read_only(self, view, *args, **kwargs):
+        if not self.pool.engines or request.method != "GET" or self.wants_primary():
+            return view(*args, **kwargs)
+        replica = self.pool.choose()
+        if replica is None:
+            metrics.registry.incr("db_replica_fallback_reads_total")
+            return view(*args, **kwargs)
+
+        g.read_replica = replica
+        try:
+            response = view(*args, **kwargs)
+        except OperationalError:
+            self.session.rollback()
+            g.read_replica = None
+            self.pool.eject(replica[0])
+            metrics.registry.incr("db_replica_fallback_reads_total")
+            return view(*args, **kwargs)
+        metrics.registry.incr("db_replica_reads_total")
+        return response
+
+    def stream_failed(self):
+        replica = g.get("read_replica")
+        if replica is not None:
+            self.pool.eject(replica[0])
+
+
+def read_only(view):
+    """ReplicaRouter.read_only for views defined before any app exists: uses the
+    router of the app handling the request."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        return current_app.extensions["replica_router"].call_read_only(view, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,208 @@
+import bisect
+import heapq
+import itertools
+import re
+import threading
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+EXACT_SCORE = 3
+PREFIX_SCORE = 2
+FUZZY_SCORE = 1
+
+MAX_QUERY_TERMS = 5
+MAX_PREFIX_TOKENS = 200
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def deletes(token):
+    # All variants of token with one character removed (the SymSpell trick): two
+    # tokens within one edit of each other always share an entry in these sets.
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def rank_key(product_id, name):
+    # Shorter names rank first, then lower IDs. Packing both into one int lets the
+    # postings be plain int sets, so unions, intersections and top-k selection all
+    # run inside the C set and heapq implementations.
+    return (len(name) << 32) | product_id
+
+
+class ProductSearchIndex:
+    """In-memory token index over product names.
+
+    Supports case-insensitive exact, prefix (last query word) and one-typo matching.
+    Updates are incremental; the sorted token list used for prefix lookups is only
+    rebuilt lazily after new tokens appear."""
+
+    def __init__(self, min_fuzzy_length=4):
+        self.min_fuzzy_length = min_fuzzy_length
+        self._names = {}
+        self._postings = {}
+        self._deletes = {}
+        self._sorted_tokens = []
+        self._sorted_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, product_id, name):
+        with self._lock:
+            if product_id in self._names:
+                self._remove(product_id)
+            self._names[product_id] = name
+            rank = rank_key(product_id, name)
+            for token in set(tokenize(name)):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    self._sorted_dirty = True
+                    if len(token) >= self.min_fuzzy_length:
+                        for variant in deletes(token):
+                            self._deletes.setdefault(variant, set()).add(token)
+                postings.add(rank)
+
+    def remove(self, product_id):
+        with self._lock:
+            self._remove(product_id)
+
+    def _remove(self, product_id):
+        name = self._names.pop(product_id, None)
+        if name is None:
+            return
+        rank = rank_key(product_id, name)
+        for token in set(tokenize(name)):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(rank)
+            if not postings:
+                del self._postings[token]
+                self._sorted_dirty = True
+                if len(token) >= self.min_fuzzy_length:
+                    for variant in deletes(token):
+                        tokens = self._deletes.get(variant)
+                        if tokens is not None:
+                            tokens.discard(token)
+                            if not tokens:
+                                del self._deletes[variant]
+
+    def clear(self):
+        with self._lock:
+            self._names.clear()
+            self._postings.clear()
+            self._deletes.clear()
+            self._sorted_tokens = []
+            self._sorted_dirty = False
+
+    def _prefix_tokens(self, prefix):
+        if self._sorted_dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._sorted_dirty = False
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        matches = []
+        for token in self._sorted_tokens[start:start + MAX_PREFIX_TOKENS]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def _fuzzy_tokens(self, term):
+        if len(term) < self.min_fuzzy_length:
+            return set()
+        candidates = set(self._deletes.get(term, ()))
+        for variant in deletes(term):
+            if variant in self._postings:
+                candidates.add(variant)
+            candidates.update(self._deletes.get(variant, ()))
+        candidates.discard(term)
+        return {token for token in candidates if within_one_edit(term, token)}
+
+    def _union(self, tokens):
+        postings = [self._postings[token] for token in tokens if token in self._postings]
+        return set().union(*postings)
+
+    def _term_tiers(self, term, is_last):
+        # Disjoint (score, ranks) groups, best first: every product counts once per
+        # term, at the best way it matched. Lazy, so a single-word search can stop
+        # as soon as the exact matches fill the page.
+        exact = self._postings.get(term, set())
+        if exact:
+            yield EXACT_SCORE, exact
+        seen = exact
+        if is_last:
+            prefix = self._union(self._prefix_tokens(term)) - seen
+            if prefix:
+                yield PREFIX_SCORE, prefix
+            seen = seen | prefix
+        fuzzy = self._union(self._fuzzy_tokens(term)) - seen
+        if fuzzy:
+            yield FUZZY_SCORE, fuzzy
+
+    def _ranked(self, ranks, limit, score, results):
+        for rank in heapq.nsmallest(limit - len(results), ranks):
+            product_id = rank & 0xFFFFFFFF
+            results.append((product_id, self._names[product_id], score))
+
+    def search(self, query, limit=10):
+        terms = tokenize(query)[:MAX_QUERY_TERMS]
+        if not terms:
+            return []
+        with self._lock:
+            results = []
+            if len(terms) == 1:
+                for score, ranks in self._term_tiers(terms[0], True):
+                    self._ranked(ranks, limit, score, results)
+                    if len(results) >= limit:
+                        break
+                return results
+
+            term_tiers = [list(self._term_tiers(term, i == len(terms) - 1)) for i, term in enumerate(terms)]
+            if not all(term_tiers):
+                return []
+
+            # Every product matched by all terms falls in exactly one combination of
+            # per-term tiers, so walking combinations by total score and taking the
+            # best-ranked products within each score yields the top results.
+            by_score = {}
+            for combination in itertools.product(*term_tiers):
+                score = sum(tier_score for tier_score, _ in combination)
+                by_score.setdefault(score, []).append([ranks for _, ranks in combination])
+
+            for score in sorted(by_score, reverse=True):
+                matches = set()
+                for rank_sets in by_score[score]:
+                    rank_sets = sorted(rank_sets, key=len)
+                    matches |= rank_sets[0].intersection(*rank_sets[1:])
+                self._ranked(matches, limit, score, results)
+                if len(results) >= limit:
+                    break
+            return results
+
+
+def within_one_edit(a, b):
+    """Whether a and b differ by at most one inserted, deleted or substituted
+    character, or one swap of adjacent characters (optimal string alignment)."""
+    if len(a) == len(b):
+        mismatches = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(mismatches) <= 1:
+            return True
+        # Transposed neighbours, the most common typo, share one deletion variant with
+        # the token they came from, so deletes() already makes them candidates.
+        if len(mismatches) == 2:
+            i, j = mismatches
+            return j == i + 1 and a[i] == b[j] and a[j] == b[i]
+        return False
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
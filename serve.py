@@ -0,0 +1,112 @@
+"""Production entry point: serves the API from gunicorn's pre-forked worker processes.
+
+    python serve.py --workers 4 --port 8000
+
+The app is built in the gunicorn master, which forks the workers from it. Each worker
+replaces the connection pools it inherited, so no database connection is ever shared
+across processes. Gunicorn replaces workers that die and stops them all on SIGTERM
+or Ctrl-C. The product search index and the first catalog page are warmed in the
+master when the caches are shared, and otherwise in each worker as it starts, since
+a worker that replaces a dead one must not inherit the master's outdated copy.
+
+The catalog version, the search index change log and the Idempotency-Key store live
+in the product and idempotency caches, so more than one worker needs both of them in
+Redis (PRODUCT_CACHE_URL and IDEMPOTENCY_CACHE_URL); with per-process caches the
+workers would serve each other's stale pages and miss each other's retries, and
+serve.py refuses to start.
+
+Settings come from the same environment variables as the app (DATABASE_URL and
+friends); --workers defaults to WEB_CONCURRENCY, or to the number of CPUs when the
+caches are shared and 1 otherwise.
+"""
+import argparse
+import os
+import sys
+
+from gunicorn.app.base import BaseApplication
+
+import metrics
+from app import app_engines, config_from_env, create_app, ensure_search_index
+from cache import is_shared
+
+
+def shared_caches(config):
+    return is_shared(config['PRODUCT_CACHE_URL']) and is_shared(config['IDEMPOTENCY_CACHE_URL'])
+
+
+def default_workers(config):
+    if "WEB_CONCURRENCY" in os.environ:
+        return int(os.environ["WEB_CONCURRENCY"])
+    return (os.cpu_count() or 1) if shared_caches(config) else 1
+
+
+def warm(app):
+    """Builds the search index and caches the first catalog page, so the workers
+    start with them and their first requests do not pay for it."""
+    with app.app_context():
+        ensure_search_index()
+    with app.test_client() as client:
+        client.get("/products")
+    # Warm-up requests are not traffic; forked workers start counting from zero.
+    metrics.registry.reset()
+    for engine in app_engines(app):
+        engine.dispose()
+
+
+class Server(BaseApplication):
+    """Runs an app that is already built, so gunicorn's master forks it as is."""
+
+    def __init__(self, app, options):
+        self.app = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for name, value in self.options.items():
+            self.cfg.set(name, value)
+
+    def load(self):
+        return self.app
+
+
+def main():
+    config = config_from_env()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=default_workers(config))
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("GUNICORN_THREADS", 4)), help="Request threads per worker.")
+    parser.add_argument("--no-warm", dest="warm", action="store_false", help="Skip warming the caches before forking.")
+    args = parser.parse_args()
+    if args.workers > 1 and not shared_caches(config):
+        parser.error("--workers > 1 needs PRODUCT_CACHE_URL and IDEMPOTENCY_CACHE_URL set to redis:// URLs, "
+                     "so that the workers share the catalog version, search index change log and "
+                     "Idempotency-Key store; set them or run with --workers 1")
+
+    app = create_app()
+    warm_in_master = args.warm and shared_caches(app.config)
+    if warm_in_master:
+        warm(app)
+
+    def post_fork(server, worker):
+        # Drops any pooled connection the fork copied without closing it, since the
+        # socket underneath still belongs to the master's connection; the worker opens
+        # its own connections as requests need them.
+        for engine in app_engines(app):
+            engine.dispose(close=False)
+        if args.warm and not warm_in_master:
+            warm(app)
+
+    Server(app, {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": "gthread",
+        "threads": args.threads,
+        "preload_app": True,
+        "post_fork": post_fork,
+    }).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import threading
+from functools import wraps
+
+from flask import Response, current_app, make_response
+
+import metrics
+
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time. Callers that ask for a key while its
+    call is running wait for it and share its result (or exception) instead of
+    running it again. Nothing is kept once the call finishes, so this only merges
+    requests that overlap and never serves a stale result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Returns (result, shared), where shared says whether another caller ran fn."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+def coalesced(key):
+    """Merges concurrent identical GET requests into one run of the view, using the
+    SingleFlight in app.extensions["single_flight"]. `key` is called in each request
+    and returns the key that makes two requests identical, or None to run the view
+    on its own. Each request gets its own copy of the leader's body, status and
+    headers, so after_request hooks never share a response object."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            flight_key = key() if current_app.config['SINGLE_FLIGHT'] else None
+            if flight_key is None:
+                return view(*args, **kwargs)
+
+            def run():
+                response = make_response(view(*args, **kwargs))
+                return response.get_data(), response.status_code, list(response.headers)
+
+            (body, status, headers), shared = current_app.extensions["single_flight"].do(flight_key, run)
+            metrics.registry.incr("single_flight_requests_total")
+            if shared:
+                metrics.registry.incr("single_flight_shared_total")
+            return Response(body, status=status, headers=headers)
+        return wrapper
+    return decorator
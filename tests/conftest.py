@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as api
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Builds apps on a fresh SQLite database with every table created."""
+    apps = []
+
+    def make(**config):
+        application = api.create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}", **config})
+        with application.app_context():
+            api.db.create_all()
+        apps.append(application)
+        return application
+
+    yield make
+    for application in apps:
+        for engine in api.app_engines(application):
+            engine.dispose()
@@ -0,0 +1,50 @@
+"""The product catalog cache: stock changes and ETags."""
+import shutil
+
+
+ORDER = {"date": "2026-01-01", "customer_id": 1, "product_ids": [1]}
+
+
+def seed(client):
+    client.post("/products", json={"name": "Pen", "price": 1.5, "stock": 10})
+    client.post("/customers", json={"name": "Ada", "email": "x@example.com", "phone": "555"})
+
+
+def test_orders_keep_cached_pages_until_stock_ttl(make_app):
+    client = make_app(PRODUCT_CACHE_STOCK_TTL=60).test_client()
+    seed(client)
+    first = client.get("/products")
+    client.post("/orders", json=ORDER)
+
+    cached = client.get("/products")
+    assert cached.json == first.json
+    assert cached.headers["ETag"] == first.headers["ETag"]
+    assert client.get("/products", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+
+def test_stock_change_rerenders_after_stock_ttl(make_app):
+    client = make_app(PRODUCT_CACHE_STOCK_TTL=0).test_client()
+    seed(client)
+    first = client.get("/products")
+    client.post("/orders", json=ORDER)
+
+    fresh = client.get("/products")
+    assert fresh.json[0]["stock"] == 9
+    assert fresh.headers["ETag"] != first.headers["ETag"]
+
+
+def test_page_from_lagging_replica_keeps_its_etag(make_app, tmp_path):
+    application = make_app(DATABASE_REPLICA_URLS=[f"sqlite:///{tmp_path / 'replica.db'}"], PRODUCT_CACHE_STOCK_TTL=60)
+    writer = application.test_client()
+    seed(writer)
+    shutil.copy(tmp_path / "test.db", tmp_path / "replica.db")
+    writer.post("/orders", json=ORDER)
+    # Only the stock change is recent, so the page is read from the replica and
+    # marked for an early re-render.
+    application.extensions["product_cache"].delete("products:changed_at")
+
+    reader = application.test_client()
+    first = reader.get("/products")
+    cached = reader.get("/products")
+    assert cached.headers["ETag"] == first.headers["ETag"]
+    assert reader.get("/products", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
@@ -0,0 +1,65 @@
+"""Deleting customers and products."""
+from sqlalchemy import select
+
+import app as api
+
+
+def test_deleting_customer_removes_their_rollups(make_app):
+    application = make_app()
+    client = application.test_client()
+    client.post("/products", json={"name": "Pen", "price": 1.5, "stock": 10})
+    for name in ("Ada", "Bob"):
+        client.post("/customers", json={"name": name, "email": "x@example.com", "phone": "555"})
+    for customer_id in (1, 2):
+        client.post("/orders", json={"date": "2026-01-01", "customer_id": customer_id, "product_ids": [1]})
+
+    assert client.delete("/customers/1").status_code == 200
+    with application.app_context():
+        session = api.db.session
+        assert session.execute(select(api.CustomerMonthlyTotals.customer_id)).scalars().all() == [2]
+        day = session.execute(select(api.DailyOrderStats)).scalar_one()
+        assert (day.orders, day.units, day.revenue) == (1, 1, 1.5)
+
+
+def test_ordered_product_cannot_be_deleted(make_app):
+    client = make_app().test_client()
+    client.post("/products", json={"name": "Pen", "price": 1.5, "stock": 10})
+    client.post("/customers", json={"name": "Ada", "email": "x@example.com", "phone": "555"})
+    client.post("/orders", json={"date": "2026-01-01", "customer_id": 1, "product_ids": [1]})
+
+    assert client.delete("/products/1").status_code == 409
+    assert client.delete("/products/2").status_code == 404
+
+
+def stock(application, product_id):
+    with application.app_context():
+        return api.db.session.get(api.Product, product_id).stock
+
+
+def test_deleting_orders_releases_their_stock(make_app):
+    application = make_app()
+    client = application.test_client()
+    client.post("/products", json={"name": "Pen", "price": 1.5, "stock": 5})
+    client.post("/customers", json={"name": "Ada", "email": "x@example.com", "phone": "555"})
+    order = {"date": "2026-01-01", "customer_id": 1, "items": [{"product_id": 1, "quantity": 2}]}
+    first, second = (client.post("/orders", json=order).json["order_id"] for _ in range(2))
+
+    client.delete(f"/cancel_order/{first}")
+    client.delete(f"/orders/{second}")
+    assert stock(application, 1) == 5
+    assert client.post("/orders", json={**order, "items": [{"product_id": 1, "quantity": 4}]}).status_code == 201
+
+
+def test_deleting_customers_releases_their_stock(make_app):
+    application = make_app()
+    client = application.test_client()
+    for name in ("Pen", "Pad"):
+        client.post("/products", json={"name": name, "price": 1.5, "stock": 10})
+    for name in ("Ada", "Bob", "Cy"):
+        client.post("/customers", json={"name": name, "email": "x@example.com", "phone": "555"})
+    for customer_id in (1, 2, 3):
+        client.post("/orders", json={"date": "2026-01-01", "customer_id": customer_id, "product_ids": [1, 1, 2]})
+
+    assert client.delete("/customers/1").status_code == 200
+    assert client.post("/customers/bulk_delete", json={"customer_ids": [2]}).status_code == 200
+    assert (stock(application, 1), stock(application, 2)) == (8, 9)
@@ -0,0 +1,40 @@
+"""Idempotency-Key replays and claim ownership."""
+from cache import MemoryCache
+
+
+PRODUCT = {"name": "Pen", "price": 1.5, "stock": 10}
+
+
+def test_retry_replays_response(make_app):
+    client = make_app().test_client()
+    first = client.post("/products", json=PRODUCT, headers={"Idempotency-Key": "k"})
+    retry = client.post("/products", json=PRODUCT, headers={"Idempotency-Key": "k"})
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert client.post("/products", json={**PRODUCT, "name": "Pad"}, headers={"Idempotency-Key": "k"}).status_code == 422
+
+
+def test_finished_request_leaves_a_newer_claim_alone(make_app):
+    application = make_app()
+    store = application.extensions["idempotency_store"]
+    replace = store.replace
+
+    # The request's claim expires while it runs and another request takes the key.
+    def taken_over(key, expected, value, ttl=None):
+        store.set(key, {**expected, "claim": "newer"})
+        return replace(key, expected, value, ttl)
+
+    store.replace = taken_over
+    client = application.test_client()
+    assert client.post("/products", json=PRODUCT, headers={"Idempotency-Key": "k"}).status_code == 201
+    assert store.get("idempotency:POST:/products:k")["claim"] == "newer"
+
+
+def test_compare_and_set():
+    cache = MemoryCache()
+    cache.set("k", {"claim": "a"})
+    assert not cache.replace("k", {"claim": "b"}, {"done": True})
+    assert cache.replace("k", {"claim": "a"}, {"done": True})
+    assert not cache.delete_if("k", {"claim": "a"})
+    assert cache.delete_if("k", {"done": True})
+    assert cache.get("k") is None
@@ -0,0 +1,72 @@
+"""Order reads run a fixed number of SQL statements however many orders they return."""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+import app as api
+
+
+PRODUCTS = 10
+LINES_PER_ORDER = 3
+PATHS = [
+    "/orders?limit=1000",
+    "/orders?limit=1000&include=products",
+    "/orders?limit=1000&include=products,items",
+    "/orders/1",
+    "/orders/1?include=products",
+    "/customers/1/orders?limit=1000",
+    "/customers/1/orders?limit=1000&include=products",
+    "/customers/1/orders?limit=1000&product_ids=false",
+]
+
+
+def add_orders(count, first_id):
+    session = api.db.session
+    orders = [
+        {"order_id": order_id, "date": date(2026, 1, 1) + timedelta(days=order_id % 90), "customer_id": 1, "total": 30.0}
+        for order_id in range(first_id, first_id + count)
+    ]
+    lines = [
+        {"order_id": order["order_id"], "product_id": (order["order_id"] + n) % PRODUCTS + 1, "quantity": 1, "unit_price": 10.0}
+        for order in orders
+        for n in range(LINES_PER_ORDER)
+    ]
+    session.execute(insert(api.Order), orders)
+    session.execute(insert(api.OrderProduct), lines)
+    session.commit()
+
+
+def statement_count(application, path):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    with application.app_context():
+        engine = api.db.engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = application.test_client().get(path)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements)
+
+
+@pytest.mark.parametrize("fast", [True, False], ids=["fast", "marshmallow"])
+def test_statements_per_request_do_not_grow_with_orders(make_app, fast):
+    application = make_app(FAST_SERIALIZATION=fast)
+    with application.app_context():
+        api.db.session.execute(insert(api.Customer), [{"name": "Ada", "email": "ada@example.com", "phone": "5550000000"}])
+        api.db.session.execute(insert(api.Product), [
+            {"name": f"product {n}", "price": 10.0, "stock": 100} for n in range(1, PRODUCTS + 1)
+        ])
+        add_orders(10, first_id=1)
+    few = {path: statement_count(application, path) for path in PATHS}
+
+    with application.app_context():
+        add_orders(190, first_id=11)
+    many = {path: statement_count(application, path) for path in PATHS}
+
+    assert many == few
@@ -0,0 +1,49 @@
+"""Placing orders: which order lines a request asks for and what they cost."""
+import pytest
+
+import app as api
+
+
+@pytest.fixture
+def client(make_app):
+    application = make_app()
+    client = application.test_client()
+    client.post("/customers", json={"name": "Ada", "email": "ada@example.com", "phone": "555"})
+    client.post("/products", json={"name": "Pen", "price": 0.1, "stock": 10})
+    client.post("/products", json={"name": "Pad", "price": 0.2, "stock": 10})
+    return client
+
+
+def test_order_needs_lines(client):
+    response = client.post("/orders", json={"date": "2026-01-01", "customer_id": 1})
+    assert response.status_code == 400
+
+
+def test_bulk_order_needs_lines(client):
+    response = client.post("/orders/bulk", json=[{"date": "2026-01-01", "customer_id": 1, "product_ids": [1]},
+                                                 {"date": "2026-01-01", "customer_id": 1}])
+    assert response.status_code == 400
+
+
+def test_repeated_product_ids_order_one_unit_each(client):
+    response = client.post("/orders", json={"date": "2026-01-01", "customer_id": 1, "product_ids": [1, 1, 2]})
+    assert response.status_code == 201
+    order = client.get(f"/orders/{response.json['order_id']}?include=items").json
+    assert {item["product_id"]: item["quantity"] for item in order["items"]} == {1: 2, 2: 1}
+    assert order["total"] == 0.4
+    with client.application.app_context():
+        assert api.db.session.get(api.Product, 1).stock == 8
+
+
+def test_update_can_leave_lines_alone(client):
+    order_id = client.post("/orders", json={"date": "2026-01-01", "customer_id": 1, "product_ids": [2]}).json["order_id"]
+    assert client.put(f"/orders/{order_id}", json={"date": "2026-01-02"}).status_code == 200
+    assert client.get(f"/orders/{order_id}").json["product_ids"] == [2]
+
+
+def test_total_matches_lines_for_fractional_cent_prices(client):
+    client.post("/products", json={"name": "Clip", "price": 0.125, "stock": 10})
+    response = client.post("/orders", json={"date": "2026-01-01", "customer_id": 1, "items": [{"product_id": 3, "quantity": 3}]})
+    order = client.get(f"/orders/{response.json['order_id']}?include=items").json
+    assert order["items"][0]["unit_price"] == 0.13
+    assert order["total"] == 0.39
@@ -0,0 +1,51 @@
+"""Read replica routing, against a primary and a replica that are two SQLite files."""
+import shutil
+
+import pytest
+
+import metrics
+
+
+CUSTOMER = {"name": "Ada", "email": "ada@example.com", "phone": "555"}
+
+
+@pytest.fixture
+def replicated(make_app, tmp_path):
+    """An app whose replica is a copy of the primary taken before Ada was renamed, so
+    the name in a response tells which database served it."""
+    application = make_app(DATABASE_REPLICA_URLS=[f"sqlite:///{tmp_path / 'replica.db'}"])
+    application.test_client().post("/customers", json=CUSTOMER)
+    shutil.copy(tmp_path / "test.db", tmp_path / "replica.db")
+    writer = application.test_client()
+    writer.put("/customers/1", json={"name": "Ada Lovelace"})
+    return application, writer
+
+
+def test_reads_go_to_the_replica(replicated):
+    application, _ = replicated
+    assert application.test_client().get("/customers/1").json["name"] == "Ada"
+
+
+def test_client_reads_its_own_writes(replicated):
+    _, writer = replicated
+    assert writer.get("/customers/1").json["name"] == "Ada Lovelace"
+
+
+def test_strong_consistency_reads_the_primary(replicated):
+    application, _ = replicated
+    response = application.test_client().get("/customers/1", headers={"X-Consistency": "strong"})
+    assert response.json["name"] == "Ada Lovelace"
+
+
+def test_failing_replica_is_ejected(make_app, tmp_path):
+    # The replica file has no tables, so every read from it fails.
+    application = make_app(DATABASE_REPLICA_URLS=[f"sqlite:///{tmp_path / 'empty.db'}"])
+    application.test_client().post("/customers", json=CUSTOMER)
+    reader = application.test_client()
+    metrics.registry.reset()
+
+    assert reader.get("/customers/1").json["name"] == "Ada"
+    assert application.extensions["replica_router"].pool.healthy() == []
+    assert reader.get("/customers/1").json["name"] == "Ada"
+    assert metrics.registry.counters["db_replica_fallback_reads_total"] == 2
+    assert metrics.registry.counters["db_replica_ejections_total"] == 1
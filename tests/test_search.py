@@ -0,0 +1,79 @@
+"""Product search: typo matching, and keeping each process's index current."""
+import pytest
+
+import app as api
+from search_index import ProductSearchIndex, within_one_edit
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("headphones", "headphones", True),
+    ("headphones", "headphone", True),
+    ("headphones", "heedphones", True),
+    ("headphones", "haedphones", True),
+    ("headphones", "haedphnoes", False),
+    ("headphones", "ehadphones", True),
+    ("headphones", "headphonse", True),
+    ("headphones", "hadphone", False),
+])
+def test_within_one_edit(a, b, expected):
+    assert within_one_edit(a, b) is expected
+    assert within_one_edit(b, a) is expected
+
+
+def test_transposed_letters_match():
+    index = ProductSearchIndex()
+    index.add(1, "Wireless Headphones")
+    assert [product_id for product_id, _, _ in index.search("haedphones")] == [1]
+
+
+def search(client, q):
+    return [product["name"] for product in client.get(f"/products/search?q={q}").json]
+
+
+@pytest.fixture
+def workers(make_app):
+    """Two apps on one database sharing a product cache, like two serve.py workers
+    sharing Redis."""
+    first, second = make_app(), make_app()
+    second.extensions["product_cache"] = first.extensions["product_cache"]
+    return first, second
+
+
+def test_other_processes_replay_name_changes(workers):
+    first, second = workers
+    writer, reader = first.test_client(), second.test_client()
+    writer.post("/products", json={"name": "Blue Lamp", "price": 1.5, "stock": 1})
+    assert search(reader, "lamp") == ["Blue Lamp"]
+    index = second.extensions["product_search"].index
+
+    writer.post("/products", json={"name": "Red Lamp", "price": 1.5, "stock": 1})
+    writer.put("/products/1", json={"name": "Green Lamp"})
+    assert search(reader, "lamp") == ["Red Lamp", "Green Lamp"]
+    writer.delete("/products/2")
+    assert search(reader, "lamp") == ["Green Lamp"]
+    # Caught up from the log, not rebuilt.
+    assert second.extensions["product_search"].index is index
+
+
+def test_import_rebuilds_other_indexes(workers):
+    first, second = workers
+    writer, reader = first.test_client(), second.test_client()
+    writer.post("/products", json={"name": "Blue Lamp", "price": 1.5, "stock": 1})
+    assert search(reader, "lamp") == ["Blue Lamp"]
+    index = second.extensions["product_search"].index
+
+    writer.post("/products/import?format=ndjson", data='{"name": "Red Lamp", "price": 2, "stock": 1}\n')
+    assert search(reader, "lamp") == ["Red Lamp", "Blue Lamp"]
+    assert second.extensions["product_search"].index is not index
+
+
+def test_gap_in_log_rebuilds(workers):
+    first, second = workers
+    writer, reader = first.test_client(), second.test_client()
+    writer.post("/products", json={"name": "Blue Lamp", "price": 1.5, "stock": 1})
+    assert search(reader, "lamp") == ["Blue Lamp"]
+
+    writer.post("/products", json={"name": "Red Lamp", "price": 1.5, "stock": 1})
+    with first.app_context():
+        first.extensions["product_cache"].delete(api.names_change_key(2))
+    assert search(reader, "lamp") == ["Red Lamp", "Blue Lamp"]
@@ -0,0 +1,33 @@
+"""?stream=json|ndjson returns the same rows as paging through the collection."""
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+import app as api
+
+
+ROWS = 23
+
+
+@pytest.fixture(params=[True, False], ids=["fast", "schema"])
+def client(make_app, monkeypatch, request):
+    monkeypatch.setattr(api, "STREAM_CHUNK_SIZE", 5)
+    application = make_app(FAST_SERIALIZATION=request.param)
+    with application.app_context():
+        session = api.db.session
+        session.execute(insert(api.Customer), [{"name": "Ada", "email": "x@example.com", "phone": "555"}])
+        session.execute(insert(api.Product), [{"name": f"Pen {n}", "price": 1.5, "stock": 10} for n in range(ROWS)])
+        session.execute(insert(api.Order), [{"date": date(2026, 1, 1), "customer_id": 1, "total": 1.5} for _ in range(ROWS)])
+        session.execute(insert(api.OrderProduct), [{"order_id": n, "product_id": n, "quantity": 1, "unit_price": 1.5} for n in range(1, ROWS + 1)])
+        session.commit()
+    return application.test_client()
+
+
+@pytest.mark.parametrize("path", ["/products", "/orders", "/customers"])
+def test_stream_matches_pages(client, path):
+    paged = client.get(f"{path}?limit=1000").json
+    assert client.get(f"{path}?stream=json").json == paged
+    lines = client.get(f"{path}?stream=ndjson").get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == paged